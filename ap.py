@@ -1,162 +1,402 @@
 import streamlit as st
-import google.generativeai as genai
+import pandas as pd
 from dotenv import load_dotenv
 import os
-from docx import Document
+import hashlib
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+import re
+import sqlite3
+import zipfile
 from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
+from xml.sax.saxutils import escape
+from diskcache import Cache, Timeout
 
 
-load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key:
-    st.error("Gemini API Key not found in .env file! Please check your .env file.")
-    st.stop()
+# Generated resumes are reused for identical submissions, across sessions, processes and restarts
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai_resume")
+CACHE_SIZE_LIMIT = 500 * 1024 * 1024
+CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+# Failures the cache can raise (unwritable directory, full disk, locked database); none of them should stop generation
+CACHE_ERRORS = (OSError, Timeout, sqlite3.Error)
 
-# Configure Gemini API
-try:
-    genai.configure(api_key=api_key)
-except Exception as e:
-    st.error(f"Error configuring Gemini API: {str(e)}")
-    st.stop()
+# Fixed instructions are sent once as the system instruction; each request only carries the form data
+SYSTEM_INSTRUCTION = """
+You are an expert resume writer. You receive the candidate's details as JSON with the fields
+name, job_type, tones, length, skills, experience and education, and write a resume of the requested length.
 
+tones lists one or more tones. With a single tone, write one resume in that tone. With several, write one complete
+resume per tone, in the given order, and start each one with a line of the form "## VARIANT <n>: <tone>".
 
-def generate_resume(name, jobs, educations, job_type, tone, length, skills):
+The resume should be highly professional, well-structured, and tailored for the requested job_type role. Include the following sections:
+1. **Personal Information**: Include the name, a professional email derived from the name (e.g., john.doe@email.com), and a phone number (e.g., +1-555-123-4567).
+2. **Professional Summary**: A concise 3-4 sentence summary highlighting the candidate's experience, skills, and career goals tailored for the job_type role.
+3. **Skills**: List the provided skills and infer additional relevant skills for the job_type role.
+4. **Experience**: Format each experience entry with the job title, company name, location, date range, problems solved, salary, and 2-3 bullet points detailing achievements inferred from problems solved.
+5. **Education**: Format each education entry with the subject, institution (inferred), date range, and grade.
+6. **Certifications** (optional): Infer relevant certifications for the job_type role if applicable.
+
+Use clear, concise, and action-oriented language. Avoid generic phrases unless supported by specific achievements. Format the resume as plain text with clear section headers (e.g., ### Personal Information) and bullet points for readability.
+"""
+
+# One entry per job/education row; salary is an int by the time these are filled in
+EXPERIENCE_TEMPLATE = (
+    "- **{position}** at {company}, {location}, {date_joined} to {date_left}\n"
+    "  - Problems Solved: {problems_solved}\n"
+    "  - Salary: ${salary:,}\n"
+    "  - Achievements: [Infer 2-3 achievements based on problems solved]"
+)
+EDUCATION_TEMPLATE = "- **{subject}**, {institution} (inferred), {date_joined} to {completion_date}, Grade: {grade}"
+
+# The user prompt is PROMPT_PREFIX followed by a JSON object with these fields, in this order
+PROMPT_PREFIX = "Write the resume for this candidate:\n"
+PROMPT_FIELDS = ("name", "job_type", "tones", "length", "skills", "experience", "education")
+
+MODEL_NAME = "gemini-2.0-flash"
+# Part of every cache key, so changing the model or any prompt text invalidates earlier resumes
+CACHE_VERSION = hashlib.blake2b(
+    "\0".join([
+        MODEL_NAME,
+        SYSTEM_INSTRUCTION,
+        PROMPT_PREFIX,
+        *PROMPT_FIELDS,
+        EXPERIENCE_TEMPLATE,
+        EDUCATION_TEMPLATE,
+    ]).encode(),
+    digest_size=8,
+).hexdigest()
+
+
+@st.cache_resource
+def load_api_key():
+    # Parses .env once per process; a missing key raises, so it isn't cached and is retried next run
+    load_dotenv()
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        raise KeyError("GOOGLE_API_KEY")
+    return api_key
+
+
+@st.cache_resource
+def init_gemini():
+    # Imported and configured on first use, once per process, so form reruns don't pay for it
+    import google.generativeai as genai
+    genai.configure(api_key=load_api_key())
+    return genai
+
+
+@st.cache_resource
+def get_model():
+    genai = init_gemini()
+    return genai.GenerativeModel(MODEL_NAME, system_instruction=SYSTEM_INSTRUCTION)
+
+
+@st.cache_resource
+def get_render_pool():
+    # Shared by all sessions for building PDF/DOCX files off the script thread
+    return ThreadPoolExecutor(max_workers=4)
+
+
+@st.cache_resource
+def get_response_cache():
+    # On-disk cache: cache key -> resume text; safe to share between threads and processes
+    return Cache(CACHE_DIR, size_limit=CACHE_SIZE_LIMIT)
+
+
+def normalize_text(value):
+    # Collapse whitespace so cosmetic edits map to the same cache entry
+    return " ".join(str(value).split())
+
+
+def normalize_skills(skills):
+    # Skill order and duplicates don't change the generated resume; case does, since it's copied into the text
+    return sorted({normalize_text(skill) for skill in skills.split(",") if skill.strip()})
+
+
+def make_cache_key(name, jobs, educations, job_type, tones, length, skills):
+    payload = {
+        "version": CACHE_VERSION,
+        "name": normalize_text(name),
+        "jobs": [{k: normalize_text(v) for k, v in job.items()} for job in jobs],
+        "educations": [{k: normalize_text(v) for k, v in edu.items()} for edu in educations],
+        "job_type": job_type,
+        "tones": tones,
+        "length": length,
+        "skills": normalize_skills(skills),
+    }
+    return hashlib.blake2b(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
+def generate_resume(name, jobs, educations, job_type, tones, length, skills, placeholder):
+    # All requested tone variants are produced by a single Gemini call.
+    # Returns (resume text or None, whether the response was cut off at the output limit)
+    key = make_cache_key(name, jobs, educations, job_type, tones, length, skills)
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        # Construct experience string
-        experience_str = "\n".join([
-            f"- **{job['position']}** at {job['company']}, {job['location']}, {job['date_joined']} to {job['date_left']}\n  - Problems Solved: {job['problems_solved']}\n  - Salary: ${job['salary']:,}\n  - Achievements: [Infer 2-3 achievements based on problems solved]"
-            for job in jobs
-        ])
-        # Construct education string
-        education_str = "\n".join([
-            f"- **{edu['subject']}**, {edu['institution']} (inferred), {edu['date_joined']} to {edu['completion_date']}, Grade: {edu['grade']}"
-            for edu in educations
-        ])
-        prompt = f"""
-        You are an expert resume writer. Create a {length}-length resume for {name} with the following details:
-        - Education: {education_str}
-        - Experience: {experience_str}
-        - Job Type: {job_type}
-        - Skills: {skills}
-        - Tone: {tone}
-
-        The resume should be highly professional, well-structured, and tailored for the {job_type} role. Include the following sections:
-        1. **Personal Information**: Include the name, a professional email (e.g., {name.lower().replace(' ', '.')}@email.com), and a phone number (e.g., +1-555-123-4567).
-        2. **Professional Summary**: A concise 3-4 sentence summary highlighting the candidate's experience, skills, and career goals tailored for the {job_type} role.
-        3. **Skills**: List the provided skills ({skills}) and infer additional relevant skills for the {job_type} role.
-        4. **Experience**: Format each experience entry with the job title, company name, location, date range, problems solved, salary, and 2-3 bullet points detailing achievements inferred from problems solved.
-        5. **Education**: Format each education entry with the subject, institution (inferred), date range, and grade.
-        6. **Certifications** (optional): Infer relevant certifications for the {job_type} role if applicable.
-
-        Use clear, concise, and action-oriented language. Avoid generic phrases unless supported by specific achievements. Format the resume as plain text with clear section headers (e.g., ### Personal Information) and bullet points for readability.
-        """
-        response = model.generate_content(prompt)
-        return response.text
+        cache = get_response_cache()
+        cached = cache.get(key)
+    except CACHE_ERRORS:
+        # The cache is only an optimisation; fall back to an uncached call
+        cache = None
+        cached = None
+    if cached is not None:
+        placeholder.markdown(cached)
+        return cached, False
+    try:
+        model = get_model()
+        # Construct experience and education strings
+        experience_str = "\n".join(EXPERIENCE_TEMPLATE.format_map(job) for job in jobs)
+        education_str = "\n".join(EDUCATION_TEMPLATE.format_map(edu) for edu in educations)
+        # Compact JSON (no separator whitespace) keeps the billed input tokens down
+        values = (name, job_type, tones, length, skills, experience_str, education_str)
+        prompt = PROMPT_PREFIX + orjson.dumps(dict(zip(PROMPT_FIELDS, values))).decode()
+        # Stream chunks to the page as they arrive instead of waiting for the full resume
+        response = model.generate_content(prompt, stream=True)
+        chunks = []
+        finish_reason = None
+        for chunk in response:
+            chunks.append(chunk.text)
+            placeholder.markdown("".join(chunks))
+            if chunk.candidates:
+                finish_reason = chunk.candidates[0].finish_reason
+        resume = "".join(chunks)
+        if not resume.strip():
+            placeholder.empty()
+            st.error("Gemini returned an empty resume. Please try again.")
+            return None, False
+        finish_reason = finish_reason.name if finish_reason is not None else None
+        # Only complete responses are cached; anything else would be served as-is for the whole TTL
+        if finish_reason == "STOP" and cache is not None:
+            try:
+                cache.set(key, resume, expire=CACHE_TTL_SECONDS)
+            except CACHE_ERRORS:
+                # The resume is already streamed and billed; a failed write only costs a future cache hit
+                pass
+        return resume, finish_reason == "MAX_TOKENS"
     except Exception as e:
+        placeholder.empty()
         st.error(f"Error generating resume: {str(e)}")
-        return None
+        return None, False
+
+
+# Several long tone variants in one response can run past the model's output limit
+TRUNCATED_WARNING = (
+    "The response reached the model's output limit, so the resume (or its last tone variant) is cut short. "
+    "Try fewer tone variants or a shorter length."
+)
+VARIANT_HEADER_RE = re.compile(r"^#{2,3}\s*VARIANT\s+\d+.*$", re.MULTILINE)
+
+# Static parts of the DOCX package; only word/document.xml changes per resume
+DOCX_XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+DOCX_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+DOCX_CONTENT_TYPES = DOCX_XML_DECL + (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '<Override PartName="/word/numbering.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>'
+    '</Types>'
+)
+DOCX_PACKAGE_RELS = DOCX_XML_DECL + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    '</Relationships>'
+)
+DOCX_DOCUMENT_RELS = DOCX_XML_DECL + (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering" Target="numbering.xml"/>'
+    '</Relationships>'
+)
+DOCX_STYLES_XML = DOCX_XML_DECL + (
+    f'<w:styles xmlns:w="{DOCX_W_NS}">'
+    '<w:docDefaults><w:rPrDefault><w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri" w:eastAsia="Calibri" w:cs="Calibri"/>'
+    '<w:sz w:val="22"/></w:rPr></w:rPrDefault><w:pPrDefault><w:pPr><w:spacing w:after="120"/></w:pPr></w:pPrDefault></w:docDefaults>'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/><w:next w:val="Normal"/>'
+    '<w:pPr><w:spacing w:after="240"/></w:pPr><w:rPr><w:b/><w:color w:val="17365D"/><w:sz w:val="52"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/><w:next w:val="Normal"/>'
+    '<w:pPr><w:keepNext/><w:spacing w:before="240" w:after="60"/><w:outlineLvl w:val="0"/></w:pPr>'
+    '<w:rPr><w:b/><w:color w:val="365F91"/><w:sz w:val="28"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="ListBullet"><w:name w:val="List Bullet"/><w:basedOn w:val="Normal"/>'
+    '<w:pPr><w:numPr><w:numId w:val="1"/></w:numPr><w:spacing w:after="60"/></w:pPr></w:style>'
+    '</w:styles>'
+)
+DOCX_NUMBERING_XML = DOCX_XML_DECL + (
+    f'<w:numbering xmlns:w="{DOCX_W_NS}">'
+    '<w:abstractNum w:abstractNumId="0"><w:multiLevelType w:val="singleLevel"/>'
+    '<w:lvl w:ilvl="0"><w:start w:val="1"/><w:numFmt w:val="bullet"/><w:pStyle w:val="ListBullet"/>'
+    '<w:lvlText w:val="\u2022"/><w:lvlJc w:val="left"/><w:pPr><w:ind w:left="360" w:hanging="360"/></w:pPr></w:lvl>'
+    '</w:abstractNum><w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>'
+    '</w:numbering>'
+)
+DOCX_DOCUMENT_HEAD = DOCX_XML_DECL + f'<w:document xmlns:w="{DOCX_W_NS}"><w:body>'
+DOCX_DOCUMENT_TAIL = (
+    '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/>'
+    '<w:pgMar w:top="1440" w:right="1440" w:bottom="1440" w:left="1440" w:header="720" w:footer="720" w:gutter="0"/>'
+    '</w:sectPr></w:body></w:document>'
+)
+DOCX_STYLES = {"H": "Heading1", "B": "ListBullet", "P": None}
+# Control characters that are not allowed in XML 1.0
+DOCX_INVALID_CHARS_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
 
 
-def create_docx(resume_text, name):
-    doc = Document()
-    doc.add_heading(f"{name}'s Resume", 0)
+def split_variants(resume, tones):
+    # Returns [(tone, text)]; if the model didn't mark every variant, the whole text is kept as one entry
+    if len(tones) == 1:
+        return [(tones[0], resume)]
+    texts = [part.strip() for part in VARIANT_HEADER_RE.split(resume)[1:]]
+    if len(texts) != len(tones):
+        return [(" / ".join(tones), resume)]
+    return list(zip(tones, texts))
+
+
+def tokenize_resume(resume_text):
+    # Classify each line once; the same token list feeds both renderers.
+    # Kinds: "H" heading, "B" bullet, "P" paragraph (may be blank)
+    tokens = []
+    append = tokens.append
     for line in resume_text.split("\n"):
-        if line.startswith("###"):
-            doc.add_heading(line.replace("###", "").strip(), level=1)
-        elif line.startswith("-"):
-            doc.add_paragraph(line.strip(), style="ListBullet")
+        stripped = line.strip()
+        if stripped.startswith("###"):
+            append(("H", stripped.lstrip("#").strip()))
+        elif stripped.startswith("-"):
+            append(("B", stripped[1:].strip()))
         else:
-            doc.add_paragraph(line.strip())
+            append(("P", stripped))
+    return tokens
+
+
+def docx_paragraph(text, style=None):
+    if not text:
+        return "<w:p/>"
+    props = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    text = escape(DOCX_INVALID_CHARS_RE.sub("", text))
+    return f'<w:p>{props}<w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+
+def create_docx(tokens, name):
+    # Assemble document.xml as one string instead of mutating a python-docx tree per paragraph
+    parts = [DOCX_DOCUMENT_HEAD, docx_paragraph(f"{name}'s Resume", "Title")]
+    parts.extend(docx_paragraph(text, DOCX_STYLES[kind]) for kind, text in tokens)
+    parts.append(DOCX_DOCUMENT_TAIL)
     buffer = BytesIO()
-    doc.save(buffer)
-    return buffer.getvalue()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        docx.writestr("_rels/.rels", DOCX_PACKAGE_RELS)
+        docx.writestr("word/_rels/document.xml.rels", DOCX_DOCUMENT_RELS)
+        docx.writestr("word/styles.xml", DOCX_STYLES_XML)
+        docx.writestr("word/numbering.xml", DOCX_NUMBERING_XML)
+        docx.writestr("word/document.xml", "".join(parts))
+    buffer.seek(0)
+    return buffer
+
 
+# US Letter in points (reportlab.lib.pagesizes.letter), with a 40pt top and bottom margin
+PDF_PAGE_SIZE = (612.0, 792.0)
+PDF_TOP = PDF_PAGE_SIZE[1] - 40
+PDF_BOTTOM = 40
+PDF_TITLE_FONT = ("Helvetica-Bold", 16)
+# Per token kind: font, x position, line height and text prefix
+PDF_LAYOUT = {
+    "H": (("Helvetica-Bold", 14), 40, 20, ""),
+    "B": (("Helvetica", 12), 50, 15, "\u2022 "),
+    "P": (("Helvetica", 12), 40, 15, ""),
+}
+# Font reportlab puts back in place at the start of every page
+PDF_PAGE_FONT = ("Helvetica", 12)
+
+
+def create_pdf(tokens, name):
+    from reportlab.pdfgen import canvas
 
-def create_pdf(resume_text, name):
     buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-    y = height - 40
-    c.setFont("Helvetica-Bold", 16)
+    # Compressed page streams keep long resumes small to download
+    c = canvas.Canvas(buffer, pagesize=PDF_PAGE_SIZE, pageCompression=1)
+    y = PDF_TOP
+    current_font = PDF_TITLE_FONT
+    c.setFont(*current_font)
     c.drawString(40, y, f"{name}'s Resume")
     y -= 30
-    c.setFont("Helvetica", 12)
-    for line in resume_text.split("\n"):
-        if y < 40:
+    for kind, text in tokens:
+        if y < PDF_BOTTOM:
             c.showPage()
-            y = height - 40
-        if line.startswith("###"):
-            c.setFont("Helvetica-Bold", 14)
-            c.drawString(40, y, line.replace("###", "").strip())
-            y -= 20
-        elif line.startswith("-"):
-            c.setFont("Helvetica", 12)
-            c.drawString(50, y, f"• {line.replace('-', '').strip()}")
-            y -= 15
-        else:
-            c.setFont("Helvetica", 12)
-            c.drawString(40, y, line.strip())
-            y -= 15
+            current_font = PDF_PAGE_FONT
+            y = PDF_TOP
+        font, x, line_height, prefix = PDF_LAYOUT[kind]
+        if text:
+            # Only emit a font change when the line needs a different font than the current one
+            if font != current_font:
+                c.setFont(*font)
+                current_font = font
+            c.drawString(x, y, prefix + text)
+        y -= line_height
     c.showPage()
     c.save()
     buffer.seek(0)
-    return buffer.getvalue()
+    return buffer
+
+
+MIME_TYPES = {
+    "PDF": "application/pdf",
+    "DOCX": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+TONES = ["Professional", "Friendly", "Creative", "Formal"]
+JOB_COLUMNS = ["company", "location", "date_joined", "date_left", "position", "problems_solved", "salary"]
+EDUCATION_COLUMNS = ["subject", "institution", "date_joined", "completion_date", "grade"]
+SALARY_RE = re.compile(r"^\$?\d{1,3}(?:,?\d{3})*$")
+DATE_RE = re.compile(r"^\d{4}-(?:0[1-9]|1[0-2])$")
+DATE_OR_PRESENT_RE = re.compile(r"^(?:\d{4}-(?:0[1-9]|1[0-2])|present)$", re.IGNORECASE)
+
+
+def complete_rows(df):
+    # Only rows with every column filled in count as an entry
+    return df.replace(r"^\s*$", pd.NA, regex=True).dropna().to_dict(orient="records")
+
+
+def validate_entries(jobs, educations):
+    # Checks salary and date formats in one pass and coerces salaries to int; returns a list of problems
+    problems = []
+    for i, job in enumerate(jobs, 1):
+        salary = job["salary"].strip()
+        if SALARY_RE.match(salary):
+            job["salary"] = int(salary.lstrip("$").replace(",", ""))
+        else:
+            problems.append(f"Job {i}: salary should be a whole number, e.g., 80000")
+        if not DATE_RE.match(job["date_joined"].strip()):
+            problems.append(f"Job {i}: date joined should look like 2022-01")
+        if not DATE_OR_PRESENT_RE.match(job["date_left"].strip()):
+            problems.append(f"Job {i}: date left should look like 2023-12 or Present")
+    for i, edu in enumerate(educations, 1):
+        if not DATE_RE.match(edu["date_joined"].strip()):
+            problems.append(f"Education {i}: date joined should look like 2018-09")
+        if not DATE_OR_PRESENT_RE.match(edu["completion_date"].strip()):
+            problems.append(f"Education {i}: completion date should look like 2022-06 or Present")
+    return problems
+
+
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "app.css")
+
+
+@st.cache_resource
+def load_css():
+    # Custom CSS for a modern, beautiful UI, read from disk once per process
+    with open(CSS_PATH, encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
 
 
 def main():
     # Set page configuration
     st.set_page_config(page_title="AI Resume Builder", page_icon="📄", layout="wide")
 
-    # Custom CSS for a modern, beautiful UI
-    st.markdown("""
-    <style>
-    .main {background-color: #f9f9f9;}
-    .stButton>button {
-        background-color: #1a73e8;
-        color: white;
-        border-radius: 8px;
-        padding: 12px 24px;
-        font-weight: bold;
-        transition: background-color 0.3s;
-    }
-    .stButton>button:hover {
-        background-color: #1557b0;
-    }
-    .stTextInput>div>input, .stTextArea>div>textarea, .stSelectbox>div>select {
-        border-radius: 8px;
-        border: 1px solid #d1d5db;
-        padding: 10px;
-        background-color: #ffffff;
-        box-shadow: 0 1px 2px rgba(0, 0, 0, 0.05);
-    }
-    .header {
-        text-align: center;
-        color: #1a73e8;
-        font-size: 40px;
-        font-weight: bold;
-        margin-bottom: 10px;
-    }
-    .subheader {
-        text-align: center;
-        color: #4b5563;
-        font-size: 18px;
-        margin-bottom: 20px;
-    }
-    .section-header {
-        color: #1f2937;
-        font-size: 20px;
-        font-weight: bold;
-        margin-top: 20px;
-    }
-    .sidebar .stSelectbox {
-        margin-bottom: 20px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    try:
+        load_api_key()
+    except KeyError:
+        st.error("Gemini API Key not found in .env file! Please check your .env file.")
+        st.stop()
+
+    # Apply custom CSS; it has to be re-emitted every run or Streamlit drops it
+    st.markdown(load_css(), unsafe_allow_html=True)
 
  
     st.markdown('<div class="header">AI Resume Builder</div>', unsafe_allow_html=True)
@@ -171,6 +411,11 @@ def main():
             ["PDF", "DOCX"],
             help="Choose the format for downloading your resume."
         )
+        extra_tones = st.multiselect(
+            "Extra Tone Variants",
+            TONES,
+            help="Also write the resume in these tones, generated in the same request."
+        )
         st.markdown("---")
         st.markdown("Powered by Gemini & Streamlit")
 
@@ -202,7 +447,7 @@ def main():
         with col2:
             tone = st.selectbox(
                 "Resume Tone *",
-                ["Professional", "Friendly", "Creative", "Formal"],
+                TONES,
                 help="Choose the tone that best fits your industry and personality."
             )
         with col3:
@@ -212,79 +457,114 @@ def main():
                 help="Select the desired length of your resume."
             )
 
-        # Experience Section (Dynamic Jobs)
+        # Experience Section (one editable row per job)
         st.markdown('<div class="section-header">Work Experience</div>', unsafe_allow_html=True)
-        jobs = []
-        for i in range(4):  # Allow up to 4 jobs
-            with st.expander(f"Job {i+1} (Expand to add details)"):
-                company = st.text_input(f"Company Name (Job {i+1})", placeholder="e.g., ABC Corp")
-                location = st.text_input(f"Location (Job {i+1})", placeholder="e.g., New York, NY")
-                date_joined = st.text_input(f"Date Joined (Job {i+1})", placeholder="e.g., 2022-01")
-                date_left = st.text_input(f"Date Left (Job {i+1})", placeholder="e.g., 2023-12 or Present")
-                position = st.text_input(f"Position (Job {i+1})", placeholder="e.g., Software Developer")
-                problems_solved = st.text_area(f"Problems Solved (Job {i+1})", placeholder="e.g., Optimized database queries...")
-                salary = st.text_input(f"Salary (Job {i+1})", placeholder="e.g., 80000")
-                if company and location and date_joined and date_left and position and problems_solved and salary:
-                    jobs.append({
-                        "company": company,
-                        "location": location,
-                        "date_joined": date_joined,
-                        "date_left": date_left,
-                        "position": position,
-                        "problems_solved": problems_solved,
-                        "salary": salary
-                    })
+        jobs_df = st.data_editor(
+            pd.DataFrame(columns=JOB_COLUMNS, dtype=str),
+            column_config={
+                "company": st.column_config.TextColumn("Company Name", help="e.g., ABC Corp"),
+                "location": st.column_config.TextColumn("Location", help="e.g., New York, NY"),
+                "date_joined": st.column_config.TextColumn("Date Joined", help="e.g., 2022-01"),
+                "date_left": st.column_config.TextColumn("Date Left", help="e.g., 2023-12 or Present"),
+                "position": st.column_config.TextColumn("Position", help="e.g., Software Developer"),
+                "problems_solved": st.column_config.TextColumn("Problems Solved", help="e.g., Optimized database queries..."),
+                "salary": st.column_config.TextColumn("Salary", help="e.g., 80000"),
+            },
+            num_rows="dynamic",
+            hide_index=True,
+            width="stretch",
+            key="jobs",
+        )
+        jobs = complete_rows(jobs_df)
 
-       
+        # Education Section (e.g., high school and college)
         st.markdown('<div class="section-header">Education</div>', unsafe_allow_html=True)
-        educations = []
-        for i in range(2):  # Allow up to 2 education entries (e.g., high school and college)
-            with st.expander(f"Education {i+1} (Expand to add details)"):
-                subject = st.text_input(f"Subject (Education {i+1})", placeholder="e.g., Computer Science")
-                institution = st.text_input(f"Institution (Education {i+1})", placeholder="e.g., XYZ University")
-                date_joined = st.text_input(f"Date Joined (Education {i+1})", placeholder="e.g., 2018-09")
-                completion_date = st.text_input(f"Completion Date (Education {i+1})", placeholder="e.g., 2022-06")
-                grade = st.text_input(f"Grade (Education {i+1})", placeholder="e.g., 3.8/4.0")
-                if subject and institution and date_joined and completion_date and grade:
-                    educations.append({
-                        "subject": subject,
-                        "institution": institution,
-                        "date_joined": date_joined,
-                        "completion_date": completion_date,
-                        "grade": grade
-                    })
+        educations_df = st.data_editor(
+            pd.DataFrame(columns=EDUCATION_COLUMNS, dtype=str),
+            column_config={
+                "subject": st.column_config.TextColumn("Subject", help="e.g., Computer Science"),
+                "institution": st.column_config.TextColumn("Institution", help="e.g., XYZ University"),
+                "date_joined": st.column_config.TextColumn("Date Joined", help="e.g., 2018-09"),
+                "completion_date": st.column_config.TextColumn("Completion Date", help="e.g., 2022-06"),
+                "grade": st.column_config.TextColumn("Grade", help="e.g., 3.8/4.0"),
+            },
+            num_rows="dynamic",
+            hide_index=True,
+            width="stretch",
+            key="educations",
+        )
+        educations = complete_rows(educations_df)
 
-     
         st.markdown("---")
         submit_button = st.form_submit_button("Generate Resume")
 
   
+    variants = None
     if submit_button:
-        if name and skills and job_type and jobs and educations:
+        problems = validate_entries(jobs, educations)
+        if name and skills and job_type and jobs and educations and not problems:
+            status = st.empty()
+            heading = st.empty()
+            resume_placeholder = st.empty()
+            tones = [tone] + [t for t in extra_tones if t != tone]
             with st.spinner("Crafting your professional resume..."):
-                resume = generate_resume(name, jobs, educations, job_type, tone, length, skills)
-                if resume:
-                    st.success("Resume generated successfully!")
-                    st.subheader("Your Resume")
-                    st.markdown(resume)
+                resume, truncated = generate_resume(
+                    name, jobs, educations, job_type, tones, length, skills, resume_placeholder
+                )
+            if resume:
+                heading.subheader("Your Resume")
+                variants = split_variants(resume, tones)
+                # Render both formats of every variant concurrently; the selected ones are awaited below
+                pool = get_render_pool()
+                st.session_state["resume_variants"] = variants
+                st.session_state["resume_name"] = name
+                st.session_state["resume_truncated"] = truncated
+                st.session_state["resume_files"] = []
+                for _, text in variants:
+                    tokens = tokenize_resume(text)
+                    st.session_state["resume_files"].append({
+                        "PDF": pool.submit(create_pdf, tokens, name),
+                        "DOCX": pool.submit(create_docx, tokens, name),
+                    })
+                status.success("Resume generated successfully!")
+        elif problems:
+            st.error("Please fix the following entries:\n\n" + "\n".join(f"- {problem}" for problem in problems))
+        else:
+            st.error("Please fill in all required fields marked with * for at least one job and one education entry.")
+        if not variants:
+            # A failed submission must not bring back the previous resume on a later rerun
+            for state_key in ("resume_variants", "resume_name", "resume_files", "resume_truncated"):
+                st.session_state.pop(state_key, None)
+    elif "resume_variants" in st.session_state:
+        # Other widget interactions (download format, download button) rerun the script; keep showing the last resume
+        variants = st.session_state["resume_variants"]
+        st.subheader("Your Resume")
+        resume_placeholder = st.empty()
+
+    if variants:
+        if st.session_state.get("resume_truncated"):
+            # Repeated on every rerun, since the cut-off resume stays on the page and in the downloads
+            st.warning(TRUNCATED_WARNING)
+        resume_name = st.session_state["resume_name"]
+        file_extension = download_format.lower()
+        with resume_placeholder.container():
+            tabs = st.tabs([variant_tone for variant_tone, _ in variants]) if len(variants) > 1 else [st.container()]
+            for i, (tab, (variant_tone, text)) in enumerate(zip(tabs, variants)):
+                with tab:
+                    st.markdown(text)
 
                     # Prepare download options
-                    if download_format == "PDF":
-                        resume_file = create_pdf(resume, name)
-                        file_extension = "pdf"
-                    else:
-                        resume_file = create_docx(resume, name)
-                        file_extension = "docx"
+                    resume_file = st.session_state["resume_files"][i][download_format].result()
+                    suffix = f"_{variant_tone.lower()}" if len(variants) > 1 else ""
 
                     # Download button
                     st.download_button(
                         label=f"Download Resume as {download_format}",
                         data=resume_file,
-                        file_name=f"{name}_resume.{file_extension}",
-                        mime=f"application/{file_extension}"
+                        file_name=f"{resume_name}{suffix}_resume.{file_extension}",
+                        mime=MIME_TYPES[download_format],
+                        key=f"download_{i}"
                     )
-        else:
-            st.error("Please fill in all required fields marked with * for at least one job and one education entry.")
 
     # Footer
     st.markdown("---")